@@ -1,6 +1,5 @@
 import os
 import numpy as np
-import sqlite3
 import tensorflow as tf
 import cv2
 from flask import Flask, request, jsonify, send_from_directory
@@ -8,8 +7,10 @@ from flask_cors import CORS
 import tempfile
 import time
 import csv
+import uuid
 from scipy.signal import butter, filtfilt
 from datetime import datetime, timedelta
+from history import init_history, insert_reading, get_user_history, start_compaction_worker
 
 app = Flask(__name__, static_folder="../frontend/build", static_url_path="/")
 CORS(app)
@@ -393,7 +394,7 @@ def predict_vitals():
     
     video_file = request.files['video']
     
-    session_id = f"{np.random.randint(10000, 99999)}"
+    session_id = uuid.uuid4().hex
     
     with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as temp_video:
         video_path = temp_video.name
@@ -477,50 +478,29 @@ def health_check():
 
 DB_PATH = "vital_signs.db"
 
-def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS vital_signs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            timestamp TEXT,
-            session_id TEXT,
-            heart_rate REAL,
-            hr_status TEXT,
-            systolic REAL,
-            diastolic REAL,
-            signal_quality TEXT,
-            age TEXT,
-            gender TEXT
-        )
-    ''')
-    conn.commit()
-    conn.close()
-
-init_db()
+init_history(DB_PATH)
+start_compaction_worker(DB_PATH)
 
 @app.route("/save-reading", methods=["POST"])
 def save_reading():
     try:
         data = request.json
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        session_id = data.get("session_id", "unknown")
-        heart_rate = data.get("heart_rate")
-        hr_status = data.get("hr_status")
-        systolic = data.get("systolic")
-        diastolic = data.get("diastolic")
-        signal_quality = data.get("signal_quality")
-        age = data.get("age", "unknown")
-        gender = data.get("gender", "unknown")
+        user_id = data.get("user_id")
+        if not user_id:
+            return jsonify({"error": "user_id is required"}), 400
 
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO vital_signs (timestamp, session_id, heart_rate, hr_status, systolic, diastolic, signal_quality, age, gender)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (timestamp, session_id, heart_rate, hr_status, systolic, diastolic, signal_quality, age, gender))
-        conn.commit()
-        conn.close()
+        insert_reading(
+            DB_PATH,
+            user_id,
+            data.get("session_id", "unknown"),
+            data.get("heart_rate"),
+            data.get("hr_status"),
+            data.get("systolic"),
+            data.get("diastolic"),
+            data.get("signal_quality"),
+            data.get("age", "unknown"),
+            data.get("gender", "unknown"),
+        )
 
         return jsonify({"message": "Reading saved successfully"}), 201
     except Exception as e:
@@ -529,6 +509,10 @@ def save_reading():
 @app.route("/get-readings", methods=["GET"])
 def get_readings():
     try:
+        user_id = request.args.get("user_id")
+        if not user_id:
+            return jsonify({"error": "user_id is required"}), 400
+
         time_range = request.args.get("range", "7days")
         now = datetime.now()
 
@@ -543,30 +527,7 @@ def get_readings():
         else:
             return jsonify({"error": "Invalid time range"}), 400
 
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT timestamp, heart_rate, hr_status, systolic, diastolic, signal_quality, age, gender
-            FROM vital_signs
-            WHERE timestamp >= ?
-            ORDER BY timestamp ASC
-        ''', (start_time.strftime('%Y-%m-%d %H:%M:%S'),))
-        rows = cursor.fetchall()
-        conn.close()
-
-        data = [
-            {
-                "timestamp": row[0],
-                "heart_rate": row[1],
-                "hr_status": row[2],
-                "systolic": row[3],
-                "diastolic": row[4],
-                "signal_quality": row[5],
-                "age": row[6],
-                "gender": row[7],
-            }
-            for row in rows
-        ]
+        data = get_user_history(DB_PATH, user_id, start_time)
 
         return jsonify(data), 200
     except Exception as e:
@@ -0,0 +1,232 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Raw readings older than this are compacted into per-user daily summaries
+RAW_RETENTION_DAYS = int(os.environ.get("RAW_RETENTION_DAYS", 30))
+# Daily summaries older than this are dropped entirely
+SUMMARY_RETENTION_DAYS = int(os.environ.get("SUMMARY_RETENTION_DAYS", 365))
+# How often the background compaction/vacuum job runs
+COMPACTION_INTERVAL_SECONDS = int(os.environ.get("COMPACTION_INTERVAL_SECONDS", 3600))
+# Pages released per incremental vacuum pass, keeps each pass short
+VACUUM_PAGES = 1000
+
+SUMMARY_METRICS = ('heart_rate', 'systolic', 'diastolic')
+
+
+def connect(db_path):
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    return conn
+
+
+def init_history(db_path):
+    conn = connect(db_path)
+    cursor = conn.cursor()
+
+    # auto_vacuum can only be switched on an existing database by a full VACUUM,
+    # after that the compaction job can hand free pages back incrementally
+    if cursor.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+        cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        cursor.execute('VACUUM')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS vital_signs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT,
+            session_id TEXT,
+            heart_rate REAL,
+            hr_status TEXT,
+            systolic REAL,
+            diastolic REAL,
+            signal_quality TEXT,
+            age TEXT,
+            gender TEXT,
+            user_id TEXT NOT NULL DEFAULT 'anonymous'
+        )
+    ''')
+
+    # Databases created before per-user history have no user column
+    columns = [row[1] for row in cursor.execute('PRAGMA table_info(vital_signs)')]
+    if 'user_id' not in columns:
+        cursor.execute("ALTER TABLE vital_signs ADD COLUMN user_id TEXT NOT NULL DEFAULT 'anonymous'")
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_vital_signs_user_time
+        ON vital_signs (user_id, timestamp)
+    ''')
+    # Lets compaction find expired rows without scanning every user
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_vital_signs_time
+        ON vital_signs (timestamp)
+    ''')
+
+    metric_columns = ',\n'.join(
+        f'''            {metric}_count INTEGER NOT NULL DEFAULT 0,
+            {metric}_sum REAL NOT NULL DEFAULT 0,
+            {metric}_min REAL,
+            {metric}_max REAL'''
+        for metric in SUMMARY_METRICS
+    )
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS vital_signs_daily (
+            user_id TEXT NOT NULL,
+            day TEXT NOT NULL,
+            reading_count INTEGER NOT NULL,
+{metric_columns},
+            PRIMARY KEY (user_id, day)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_vital_signs_daily_day
+        ON vital_signs_daily (day)
+    ''')
+
+    conn.commit()
+    conn.close()
+
+
+def insert_reading(db_path, user_id, session_id, heart_rate, hr_status, systolic, diastolic, signal_quality, age, gender):
+    timestamp = datetime.now().strftime(TIMESTAMP_FORMAT)
+    conn = connect(db_path)
+    with conn:
+        conn.execute('''
+            INSERT INTO vital_signs (user_id, timestamp, session_id, heart_rate, hr_status, systolic, diastolic, signal_quality, age, gender)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (user_id, timestamp, session_id, heart_rate, hr_status, systolic, diastolic, signal_quality, age, gender))
+    conn.close()
+
+
+def raw_cutoff(now=None):
+    # Day-aligned so a calendar day is never split between raw rows and its summary
+    now = now or datetime.now()
+    cutoff = (now - timedelta(days=RAW_RETENTION_DAYS)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return cutoff.strftime(TIMESTAMP_FORMAT)
+
+
+def get_user_history(db_path, user_id, start_time):
+    start = start_time.strftime(TIMESTAMP_FORMAT)
+    cutoff = raw_cutoff()
+
+    conn = connect(db_path)
+    cursor = conn.cursor()
+
+    data = []
+
+    # Older part of the range is served from the daily rollups
+    if start < cutoff:
+        cursor.execute(f'''
+            SELECT day, reading_count,
+                   {', '.join(f'{m}_sum / NULLIF({m}_count, 0)' for m in SUMMARY_METRICS)}
+            FROM vital_signs_daily
+            WHERE user_id = ? AND day >= ? AND day < ?
+            ORDER BY day ASC
+        ''', (user_id, start[:10], cutoff[:10]))
+        for row in cursor.fetchall():
+            data.append({
+                "timestamp": f"{row[0]} 12:00:00",
+                "heart_rate": row[2],
+                "hr_status": None,
+                "systolic": row[3],
+                "diastolic": row[4],
+                "signal_quality": None,
+                "age": None,
+                "gender": None,
+                "aggregated": True,
+                "reading_count": row[1],
+            })
+
+    cursor.execute('''
+        SELECT timestamp, heart_rate, hr_status, systolic, diastolic, signal_quality, age, gender
+        FROM vital_signs
+        WHERE user_id = ? AND timestamp >= ?
+        ORDER BY timestamp ASC
+    ''', (user_id, start))
+    for row in cursor.fetchall():
+        data.append({
+            "timestamp": row[0],
+            "heart_rate": row[1],
+            "hr_status": row[2],
+            "systolic": row[3],
+            "diastolic": row[4],
+            "signal_quality": row[5],
+            "age": row[6],
+            "gender": row[7],
+            "aggregated": False,
+            "reading_count": 1,
+        })
+
+    conn.close()
+    return data
+
+
+def compact_history(db_path, now=None):
+    now = now or datetime.now()
+    cutoff = raw_cutoff(now)
+    summary_cutoff = (now - timedelta(days=SUMMARY_RETENTION_DAYS)).strftime('%Y-%m-%d')
+
+    select_metrics = ',\n'.join(
+        f'COUNT({m}), COALESCE(SUM({m}), 0), MIN({m}), MAX({m})' for m in SUMMARY_METRICS
+    )
+    insert_columns = ', '.join(
+        f'{m}_count, {m}_sum, {m}_min, {m}_max' for m in SUMMARY_METRICS
+    )
+    # Merge into an existing rollup, e.g. readings that arrived late for an already compacted day
+    merge_metrics = ',\n'.join(
+        f'''{m}_count = {m}_count + excluded.{m}_count,
+            {m}_sum = {m}_sum + excluded.{m}_sum,
+            {m}_min = MIN(COALESCE({m}_min, excluded.{m}_min), COALESCE(excluded.{m}_min, {m}_min)),
+            {m}_max = MAX(COALESCE({m}_max, excluded.{m}_max), COALESCE(excluded.{m}_max, {m}_max))'''
+        for m in SUMMARY_METRICS
+    )
+
+    conn = connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('BEGIN IMMEDIATE')
+    try:
+        cursor.execute(f'''
+            INSERT INTO vital_signs_daily (user_id, day, reading_count, {insert_columns})
+            SELECT user_id, substr(timestamp, 1, 10), COUNT(*),
+                   {select_metrics}
+            FROM vital_signs
+            WHERE timestamp < ?
+            GROUP BY user_id, substr(timestamp, 1, 10)
+            ON CONFLICT (user_id, day) DO UPDATE SET
+                reading_count = reading_count + excluded.reading_count,
+                {merge_metrics}
+        ''', (cutoff,))
+        cursor.execute('DELETE FROM vital_signs WHERE timestamp < ?', (cutoff,))
+        compacted = cursor.rowcount
+        cursor.execute('DELETE FROM vital_signs_daily WHERE day < ?', (summary_cutoff,))
+        expired = cursor.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        conn.close()
+        raise
+
+    cursor.execute(f'PRAGMA incremental_vacuum({VACUUM_PAGES})').fetchall()
+    cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    conn.close()
+
+    return {"compacted_readings": compacted, "expired_summaries": expired}
+
+
+def start_compaction_worker(db_path, interval=COMPACTION_INTERVAL_SECONDS):
+    stop_event = threading.Event()
+
+    def run():
+        while not stop_event.is_set():
+            try:
+                compact_history(db_path)
+            except Exception as e:
+                print(f"Warning: History compaction failed: {e}")
+            stop_event.wait(interval)
+
+    worker = threading.Thread(target=run, name="history-compaction", daemon=True)
+    worker.start()
+    return stop_event
@@ -1,6 +1,7 @@
 import React, { useState, useRef, useEffect } from 'react';
 import { Camera, CircleOff, Activity, Loader, Heart, ArrowLeft, AlertCircle, UserCheck, SignalHigh} from 'lucide-react';
 import Graph from './graph';
+import { getUserId } from './userId';
 
 const BPPredictionApp = ({ onBack, onSaveReading  }) => {
   const [recording, setRecording] = useState(false);
@@ -126,7 +127,7 @@ const BPPredictionApp = ({ onBack, onSaveReading  }) => {
       await fetch('http://localhost:5000/save-reading', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(result),
+        body: JSON.stringify({ ...result, user_id: getUserId() }),
       });
 
       onSaveReading(result);
@@ -182,7 +183,7 @@ const BPPredictionApp = ({ onBack, onSaveReading  }) => {
 
   const fetchHistoricalData = async (timeRange) => {
     try {
-      const response = await fetch(`http://localhost:5000/get-readings?range=${timeRange}`);
+      const response = await fetch(`http://localhost:5000/get-readings?range=${timeRange}&user_id=${getUserId()}`);
       if (!response.ok) {
         throw new Error("Failed to fetch historical data");
       }
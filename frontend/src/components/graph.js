@@ -12,6 +12,7 @@ import {
 } from 'recharts';
 import { format } from 'date-fns';
 import { motion } from 'framer-motion';
+import { getUserId } from './userId';
 
 const Graph = ({ onBack }) => {
   const [data, setData] = useState([]);
@@ -25,7 +26,7 @@ const Graph = ({ onBack }) => {
     setLoading(true);
     setError(null);
     try {
-      const response = await fetch(`http://localhost:5000/get-readings?range=${timeRange}`);
+      const response = await fetch(`http://localhost:5000/get-readings?range=${timeRange}&user_id=${getUserId()}`);
       if (!response.ok) throw new Error('Failed to fetch data');
       const result = await response.json();
 
@@ -0,0 +1,11 @@
+const USER_ID_KEY = 'vitals_user_id';
+
+// Stable per-browser id so the backend can keep each user's history separate
+export const getUserId = () => {
+  let userId = localStorage.getItem(USER_ID_KEY);
+  if (!userId) {
+    userId = crypto.randomUUID();
+    localStorage.setItem(USER_ID_KEY, userId);
+  }
+  return userId;
+};